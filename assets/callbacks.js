@@ -0,0 +1,128 @@
+var PRICE_RANGE_DEBOUNCE_MS = 300;
+var latestPriceRange = null;
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    clientside: {
+        // Resolve with the slider value once it has been stable for the debounce
+        // interval; superseded values resolve to no_update so the store stays put
+        debounce_price_range: function(price_range) {
+            latestPriceRange = price_range;
+            return new Promise(function(resolve) {
+                setTimeout(function() {
+                    if (latestPriceRange === price_range) {
+                        resolve(price_range);
+                    } else {
+                        resolve(window.dash_clientside.no_update);
+                    }
+                }, PRICE_RANGE_DEBOUNCE_MS);
+            });
+        },
+
+        // Build the four figures from the aggregates in agg_store, keeping each graph's
+        // current layout and replacing only its traces and annotations
+        build_figures: function(aggregates, colors, category_dist, price_dist, dosage_price, quantity) {
+            function withTraces(figure, traces, annotations) {
+                return {
+                    data: traces,
+                    layout: Object.assign({}, figure.layout, {annotations: annotations || []})
+                };
+            }
+
+            // No data after filtering: clear every graph
+            if (!aggregates) {
+                return [category_dist, price_dist, dosage_price, quantity].map(function(figure) {
+                    return withTraces(figure, []);
+                });
+            }
+
+            var categoryColor = function(cat) { return colors.categories[cat]; };
+
+            var catCounts = aggregates.cat_counts;
+            var categoryDistTraces = [{
+                type: 'bar',
+                x: catCounts.labels,
+                y: catCounts.counts,
+                marker: {color: catCounts.labels.map(categoryColor), line: {color: 'black', width: 1}}
+            }];
+
+            // Box plot from precomputed quartiles and whiskers, with outliers on top
+            var boxStats = aggregates.box_stats;
+            var priceDistTraces = [{
+                type: 'box',
+                name: 'Price',
+                x: boxStats.labels,
+                q1: boxStats.q1,
+                median: boxStats.median,
+                q3: boxStats.q3,
+                lowerfence: boxStats.lowerfence,
+                upperfence: boxStats.upperfence,
+                marker: {color: colors.box, line: {color: 'black', width: 1}}
+            }, {
+                type: 'scatter',
+                mode: 'markers',
+                name: 'Outliers',
+                x: boxStats.outlier_x,
+                y: boxStats.outlier_y,
+                marker: {color: colors.box, line: {color: 'black', width: 1}}
+            }];
+
+            // One WebGL scatter trace per category present in the filtered slice
+            var scatterSample = aggregates.scatter_sample;
+            var dosagePriceTraces = scatterSample.traces.map(function(trace) {
+                return {
+                    type: 'scattergl',
+                    mode: 'markers',
+                    name: trace.category,
+                    x: trace.dosage,
+                    y: trace.price,
+                    marker: {
+                        color: categoryColor(trace.category),
+                        size: 10,
+                        opacity: 0.7,
+                        line: {width: 1, color: 'DarkSlateGrey'}
+                    }
+                };
+            });
+            var dosagePriceAnnotations = [];
+            if (scatterSample.shown < scatterSample.total) {
+                dosagePriceAnnotations.push({
+                    text: 'Showing ' + scatterSample.shown.toLocaleString('en-US') +
+                        ' of ' + scatterSample.total.toLocaleString('en-US') + ' points',
+                    xref: 'paper', yref: 'paper', x: 1, y: 1.08, showarrow: false
+                });
+            }
+
+            var quantitySum = aggregates.quantity_sum;
+            var quantityTraces = [{
+                type: 'pie',
+                labels: quantitySum.labels,
+                values: quantitySum.values,
+                marker: {colors: quantitySum.labels.map(categoryColor)},
+                textinfo: 'percent+label',
+                pull: [0.1, 0.1]
+            }];
+
+            return [
+                withTraces(category_dist, categoryDistTraces),
+                withTraces(price_dist, priceDistTraces),
+                withTraces(dosage_price, dosagePriceTraces, dosagePriceAnnotations),
+                withTraces(quantity, quantityTraces)
+            ];
+        },
+
+        // Return the display style of each graph div for the selected graph type
+        toggle_visibility: function(graph_type, table_data) {
+            var graphs = ['category_dist', 'price_dist', 'dosage_price', 'quantity'];
+
+            // Hide every graph when the filters leave no data
+            if (!table_data || table_data.length === 0) {
+                return graphs.map(function() { return {'display': 'none'}; });
+            }
+
+            return graphs.map(function(graph) {
+                var visible = graph_type === 'all' || graph_type === graph;
+                return {'display': visible ? 'block' : 'none'};
+            });
+        }
+    }
+});
@@ -1,17 +1,212 @@
 import dash
+from dash import DiskcacheManager
+import diskcache
 import dash_core_components as dcc
 import dash_html_components as html
 import plotly.express as px
 import pandas as pd
 import dash_table
-from dash.dependencies import Input, Output
+from dash.dependencies import Input, Output, State, ClientsideFunction
 import plotly.graph_objects as go
+import numpy as np
+import hashlib
+from flask_caching import Cache
 
-# Load the data
-data = pd.read_csv('medicine_data.csv')
+# Load the data with the pyarrow CSV reader: Category is read straight into a categorical
+# and the text columns into Arrow-backed strings. Price and Quantity stay numpy-backed
+# since the filters binary-search and prefix-sum them as numpy arrays.
+data = pd.read_csv('medicine_data.csv', engine='pyarrow', dtype={
+    'Medicine': 'string[pyarrow]',
+    'Dosage': 'string[pyarrow]',
+    'Category': 'category',
+})
+CATEGORIES = data['Category'].cat.categories
+
+# Fixed colour per category so every chart agrees regardless of the active filter
+CATEGORY_COLORS = {cat: px.colors.qualitative.Plotly[i % len(px.colors.qualitative.Plotly)] for i, cat in enumerate(CATEGORIES)}
+
+# Box plot summary per category: quartiles, whiskers at the furthest prices within
+# 1.5 IQR of the box (as plotly draws them), and the prices beyond them as outliers
+def price_box_stats(frame):
+    stats = {'labels': [], 'q1': [], 'median': [], 'q3': [], 'lowerfence': [], 'upperfence': [],
+             'outlier_x': [], 'outlier_y': []}
+    for cat, group in frame.groupby('Category', observed=True):
+        prices = group['Price'].to_numpy()
+        q1, median, q3 = np.percentile(prices, [25, 50, 75])
+        iqr = q3 - q1
+        inside = (prices >= q1 - 1.5 * iqr) & (prices <= q3 + 1.5 * iqr)
+        outliers = prices[~inside]
+        stats['labels'].append(cat)
+        stats['q1'].append(float(q1))
+        stats['median'].append(float(median))
+        stats['q3'].append(float(q3))
+        stats['lowerfence'].append(float(prices[inside].min()))
+        stats['upperfence'].append(float(prices[inside].max()))
+        stats['outlier_x'].extend([cat] * len(outliers))
+        stats['outlier_y'].extend(outliers.tolist())
+    return stats
+
+
+# Precompute aggregates once at startup so callbacks over the full dataset can reuse them
+PRICE_MIN = data['Price'].min()
+PRICE_MAX = data['Price'].max()
+CAT_QTY = data.groupby('Category', observed=True)['Quantity'].sum()
+CAT_PRICE_STATS = price_box_stats(data)
+
+# Dropdown options and slider marks, built once rather than inline in the layout
+CATEGORY_OPTIONS = [{'label': 'All', 'value': 'All'}] + [{'label': cat, 'value': cat} for cat in CATEGORIES]
+PRICE_MARKS = {i: str(i) for i in range(int(PRICE_MIN), int(PRICE_MAX) + 1, 10)}
+
+# Keep price-sorted copies of the data (overall and per category) so a price range
+# filter becomes two binary searches and a slice instead of a full boolean mask. The
+# table rows are converted to records once here, so filtering them is a list slice,
+# and Quantity prefix sums turn a range total into a single subtraction.
+TABLE_COLUMNS = ['Medicine', 'Price', 'Dosage', 'Quantity', 'Category']
+
+
+def sorted_slice(frame):
+    quantity_cumsum = np.concatenate([[0], np.cumsum(frame['Quantity'].to_numpy())])
+    return frame, frame['Price'].to_numpy(), frame[TABLE_COLUMNS].to_dict('records'), quantity_cumsum
+
+
+data_sorted = data.sort_values('Price', kind='stable').reset_index(drop=True)
+SORTED_SLICES = {'All': sorted_slice(data_sorted)}
+for cat, group in data_sorted.groupby('Category', observed=True, sort=False):
+    SORTED_SLICES[cat] = sorted_slice(group.reset_index(drop=True))
+
+# Run the heavy aggregation callback in a background process so it does not tie up the
+# web worker serving other users. DiskcacheManager starts a process per call on this
+# machine only and is a stand-in for local runs; a multi-user deployment should use
+# CeleryManager backed by a shared broker instead.
+background_callback_manager = DiskcacheManager(diskcache.Cache('background-cache'))
 
 # Create the Dash application
-app = dash.Dash(__name__)
+app = dash.Dash(__name__, background_callback_manager=background_callback_manager)
+
+# Server-side cache for computed aggregates, shared by every worker process
+cache = Cache(app.server, config={
+    'CACHE_TYPE': 'FileSystemCache',
+    'CACHE_DIR': 'cache-directory',
+    'CACHE_DEFAULT_TIMEOUT': 3600,
+})
+
+# Version of the data and code behind cached entries. It is folded into the memoize keys
+# so a restart with a changed CSV or module never serves stale results, while workers
+# running the same version keep sharing their entries.
+with open('medicine_data.csv', 'rb') as csv_file, open(__file__, 'rb') as source_file:
+    CACHE_VERSION = hashlib.sha1(csv_file.read() + source_file.read()).hexdigest()[:12]
+
+# Largest number of points drawn in the dosage vs price scatter before it is downsampled
+SCATTER_MAX_POINTS = 5000
+
+
+# Select the rows of a category (or 'All') whose price lies within [price_lo, price_hi],
+# returned both as a DataFrame slice and as the matching table records
+def filter_data(category_filter, price_lo, price_hi):
+    if category_filter not in SORTED_SLICES:
+        return data_sorted.iloc[0:0], []
+
+    frame, prices, records, _ = SORTED_SLICES[category_filter]
+    lo_i, hi_i = price_bounds(prices, price_lo, price_hi)
+    return frame.iloc[lo_i:hi_i], records[lo_i:hi_i]
+
+
+# Index range of the sorted prices that lie within [price_lo, price_hi]
+def price_bounds(prices, price_lo, price_hi):
+    return np.searchsorted(prices, price_lo, side='left'), np.searchsorted(prices, price_hi, side='right')
+
+
+# Total Quantity per category within [price_lo, price_hi], read off each category's
+# prefix sums instead of aggregating the filtered rows
+def quantity_totals(category_filter, price_lo, price_hi):
+    categories = CATEGORIES if category_filter == 'All' else [category_filter]
+    labels, totals = [], []
+    for cat in categories:
+        _, prices, _, quantity_cumsum = SORTED_SLICES[cat]
+        lo_i, hi_i = price_bounds(prices, price_lo, price_hi)
+        if hi_i > lo_i:
+            labels.append(cat)
+            totals.append(quantity_cumsum[hi_i] - quantity_cumsum[lo_i])
+    return np.array(labels), np.array(totals)
+
+
+# Compute the aggregates behind all four graphs for a filter combination. Everything is
+# kept as plain JSON types so it can be cached and sent as-is to the browser, which
+# draws the graphs from the agg_store dcc.Store. The table rows are left out: they are already a list
+# slice of precomputed records and would only cost pickling in the cache.
+@cache.memoize(timeout=3600, make_name=lambda name: f'{name}/{CACHE_VERSION}')
+def compute_aggregates(category_filter, price_lo, price_hi):
+    filtered_data, _ = filter_data(category_filter, price_lo, price_hi)
+
+    # Check if filtered data is empty
+    print("Filtered data shape:", filtered_data.shape)
+
+    if filtered_data.shape[0] == 0:
+        return None
+
+    # The scatter draws every point, so dense slices are reduced to a stratified sample
+    # per category; the bar, box and pie charts aggregate and keep the full slice
+    if len(filtered_data) > SCATTER_MAX_POINTS:
+        scatter_data = filtered_data.groupby('Category', observed=True).sample(
+            frac=SCATTER_MAX_POINTS / len(filtered_data), random_state=0)
+    else:
+        scatter_data = filtered_data
+    scatter_codes = scatter_data['Category'].cat.codes.to_numpy()
+    dosages = scatter_data['Dosage'].to_numpy()
+    prices = scatter_data['Price'].to_numpy()
+
+    # The unfiltered dataset reuses the aggregates computed at startup
+    if category_filter == 'All' and price_lo <= PRICE_MIN and price_hi >= PRICE_MAX:
+        quantity_labels, quantity_values = CAT_QTY.index.to_numpy(), CAT_QTY.to_numpy()
+        price_stats = CAT_PRICE_STATS
+    else:
+        price_stats = price_box_stats(filtered_data)
+        quantity_labels, quantity_values = quantity_totals(category_filter, price_lo, price_hi)
+
+    # Count medicines per category from the integer category codes
+    count_codes, cat_counts = np.unique(filtered_data['Category'].cat.codes.to_numpy(), return_counts=True)
+
+    # The point indices of every scatter category come from a single stable sort of the
+    # codes rather than a separate boolean mask per category
+    order = np.argsort(scatter_codes, kind='stable')
+    trace_codes, trace_starts = np.unique(scatter_codes[order], return_index=True)
+
+    aggregates = {
+        'cat_counts': {
+            'labels': CATEGORIES[count_codes].tolist(),
+            'counts': cat_counts.tolist(),
+        },
+        'box_stats': price_stats,
+        'scatter_sample': {
+            'traces': [
+                {'category': CATEGORIES[code], 'dosage': dosages[indices].tolist(), 'price': prices[indices].tolist()}
+                for code, indices in zip(trace_codes, np.split(order, trace_starts[1:]))
+            ],
+            'shown': len(scatter_data),
+            'total': len(filtered_data),
+        },
+        'quantity_sum': {
+            'labels': quantity_labels.tolist(),
+            'values': quantity_values.tolist(),
+        },
+    }
+    return aggregates
+
+
+# Empty figure carrying a graph's layout. The traces are drawn in the browser from the
+# aggregates in agg_store (see assets/callbacks.js), so the server never builds them.
+def empty_figure(**layout):
+    fig = go.Figure()
+    fig.update_layout(**layout)
+    return fig.to_plotly_json()
+
+
+# Aggregates for the unfiltered dataset, seeded into agg_store so the graphs are drawn on
+# page load without a round trip to the server
+INITIAL_AGGREGATES = compute_aggregates('All', float(PRICE_MIN), float(PRICE_MAX))
+
+# Colours used by the clientside figure builders
+CHART_COLORS = {'categories': CATEGORY_COLORS, 'box': px.colors.qualitative.Plotly[0]}
 
 # Layout of the web application
 app.layout = html.Div([
@@ -38,7 +233,7 @@ app.layout = html.Div([
         html.Label('Select Category'),
         dcc.Dropdown(
             id='category_filter',
-            options=[{'label': 'All', 'value': 'All'}] + [{'label': cat, 'value': cat} for cat in data['Category'].unique()],
+            options=CATEGORY_OPTIONS,
             value='All',  # Default value
         )
     ]),
@@ -48,21 +243,33 @@ app.layout = html.Div([
         html.Label('Filter by Price Range'),
         dcc.RangeSlider(
             id='price_range',
-            min=data['Price'].min(),
-            max=data['Price'].max(),
+            min=PRICE_MIN,
+            max=PRICE_MAX,
             step=1,
-            marks={i: str(i) for i in range(int(data['Price'].min()), int(data['Price'].max()), 10)},
-            value=[data['Price'].min(), data['Price'].max()]
+            marks=PRICE_MARKS,
+            value=[PRICE_MIN, PRICE_MAX],
+            # Report values while dragging; the debounce below merges them into one update
+            updatemode='drag'
         ),
+        # Debounced copy of the slider value; the graphs are rebuilt from this store
+        dcc.Store(id='price_range_debounced', data=[PRICE_MIN, PRICE_MAX]),
     ]),
 
-    # Divs for all graphs
-    html.Div([
-        html.Div([dcc.Graph(id='category_dist')], id='category_dist_div', style={'display': 'block'}),
-        html.Div([dcc.Graph(id='price_dist')], id='price_dist_div', style={'display': 'block'}),
-        html.Div([dcc.Graph(id='dosage_price')], id='dosage_price_div', style={'display': 'block'}),
-        html.Div([dcc.Graph(id='quantity')], id='quantity_div', style={'display': 'block'}),
-    ]),
+    # Aggregates of the filtered data, shared by the per-graph callbacks
+    dcc.Store(id='agg_store', data=INITIAL_AGGREGATES),
+    dcc.Store(id='chart_colors', data=CHART_COLORS),
+
+    # Divs for all graphs, with a spinner shown while they are being updated
+    dcc.Loading(html.Div([
+        html.Div([dcc.Graph(id='category_dist', figure=empty_figure(
+            title='Distribution of Medicines by Category', xaxis_title='Category', yaxis_title='count'))], id='category_dist_div', style={'display': 'block'}),
+        html.Div([dcc.Graph(id='price_dist', figure=empty_figure(
+            title='Price Distribution per Category', xaxis_title='Category', yaxis_title='Price', showlegend=False))], id='price_dist_div', style={'display': 'block'}),
+        html.Div([dcc.Graph(id='dosage_price', figure=empty_figure(
+            title='Dosage vs Price of Medicines', xaxis_title='Dosage', yaxis_title='Price', legend_title='Category'))], id='dosage_price_div', style={'display': 'block'}),
+        html.Div([dcc.Graph(id='quantity', figure=empty_figure(
+            title='Total Quantity of Medicines by Category'))], id='quantity_div', style={'display': 'block'}),
+    ])),
 
     # Data Table to display medicine data
     html.Div([
@@ -76,78 +283,101 @@ app.layout = html.Div([
                 {'name': 'Quantity', 'id': 'Quantity'},
                 {'name': 'Category', 'id': 'Category'}
             ],
-            data=[],  # Default empty data, will be updated dynamically
+            data=SORTED_SLICES['All'][2],  # Unfiltered rows to match the initial figures, updated dynamically
+            # Only the rows scrolled into view are rendered to the DOM
+            virtualization=True,
+            page_action='none',
+            fixed_rows={'headers': True},
             style_table={'height': '400px', 'overflowY': 'auto'},
-            style_cell={'textAlign': 'center', 'padding': '10px'},
+            # Virtualized tables need fixed column widths to keep header and rows aligned
+            style_cell={'textAlign': 'center', 'padding': '10px', 'minWidth': '120px', 'width': '120px', 'maxWidth': '120px'},
             style_header={'backgroundColor': 'lightgrey', 'fontWeight': 'bold'}
         ),
     ])
 ])
 
-# Define the callback to update the graph based on user input
+# Define the callback that filters the data and shares the aggregates with the graphs
 @app.callback(
-    [Output('category_dist', 'figure'),
-     Output('price_dist', 'figure'),
-     Output('dosage_price', 'figure'),
-     Output('quantity', 'figure'),
-     Output('category_dist_div', 'style'),
-     Output('price_dist_div', 'style'),
-     Output('dosage_price_div', 'style'),
-     Output('quantity_div', 'style'),
-     Output('medicine_table', 'data')],  # Update the table data
-    [Input('graph_type', 'value'),
-     Input('category_filter', 'value'),
-     Input('price_range', 'value')]
+    Output('agg_store', 'data'),
+    [Input('category_filter', 'value'),
+     Input('price_range_debounced', 'data')],
+    # The store and graphs are already seeded with the unfiltered data
+    prevent_initial_call=True,
+    background=True,
+    # Poll the background job often; the default 1s poll would dominate a fast update
+    interval=150,
+    # Lock the filters until the running update has finished
+    running=[
+        (Output('category_filter', 'disabled'), True, False),
+        (Output('price_range', 'disabled'), True, False),
+    ],
 )
-def update_graph(graph_type, category_filter, price_range):
+def update_aggregates(category_filter, price_range):
     # Filter the data based on the selected category and price range
     print("Received category filter:", category_filter)
     print("Price range:", price_range)
-    
-    filtered_data = data[(data['Price'] >= price_range[0]) & (data['Price'] <= price_range[1])]
-    
-    if category_filter != 'All':
-        filtered_data = filtered_data[filtered_data['Category'] == category_filter]
-    
-    # Check if filtered data is empty
-    print("Filtered data shape:", filtered_data.shape)
-    
-    # Return empty values if no data is available
-    if filtered_data.shape[0] == 0:
+
+    aggregates = compute_aggregates(category_filter, float(price_range[0]), float(price_range[1]))
+
+    if aggregates is None:
         print("No data available after filtering.")
-        return {}, {}, {}, {}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, []
 
-    # Create figures for each plot
-    category_dist_fig = px.bar(filtered_data, x='Category', title='Distribution of Medicines by Category', color='Category')
+    return aggregates
 
-    price_dist_fig = px.box(filtered_data, x='Category', y='Price', title='Price Distribution per Category')
 
-    dosage_price_fig = px.scatter(filtered_data, x='Dosage', y='Price', color='Category', title='Dosage vs Price of Medicines')
+# Update the table in a regular callback: its rows are a list slice of precomputed
+# records, too cheap to justify a background job that would pickle every row
+@app.callback(
+    Output('medicine_table', 'data'),
+    [Input('category_filter', 'value'),
+     Input('price_range_debounced', 'data')],
+    # The table is already seeded with the unfiltered rows
+    prevent_initial_call=True
+)
+def update_table(category_filter, price_range):
+    _, table_data = filter_data(category_filter, float(price_range[0]), float(price_range[1]))
+    return table_data
 
-    quantity_fig = px.pie(filtered_data.groupby('Category')['Quantity'].sum().reset_index(), names='Category', values='Quantity', title='Total Quantity of Medicines by Category')
 
-    # Customize layout and add hover functionality
-    category_dist_fig.update_traces(marker=dict(line=dict(color="black", width=1)))
-    price_dist_fig.update_traces(marker=dict(line=dict(color="black", width=1)))
-    dosage_price_fig.update_traces(marker=dict(size=10, opacity=0.7, line=dict(width=1, color='DarkSlateGrey')))
-    quantity_fig.update_traces(textinfo="percent+label", pull=[0.1, 0.1])
+# Draw all four graphs in the browser from the aggregates in agg_store, which is plain
+# JSON already; filter changes only ship the aggregates, and graph_type stays clientside
+app.clientside_callback(
+    ClientsideFunction(namespace='clientside', function_name='build_figures'),
+    [Output('category_dist', 'figure'),
+     Output('price_dist', 'figure'),
+     Output('dosage_price', 'figure'),
+     Output('quantity', 'figure')],
+    [Input('agg_store', 'data')],
+    [State('chart_colors', 'data'),
+     State('category_dist', 'figure'),
+     State('price_dist', 'figure'),
+     State('dosage_price', 'figure'),
+     State('quantity', 'figure')]
+)
+
 
-    # Get data for the DataTable
-    table_data = filtered_data[['Medicine', 'Price', 'Dosage', 'Quantity', 'Category']].to_dict('records')
+# Forward the slider value to the store only once it has settled for 300ms, so a burst
+# of slider changes triggers a single server update
+app.clientside_callback(
+    ClientsideFunction(namespace='clientside', function_name='debounce_price_range'),
+    Output('price_range_debounced', 'data'),
+    Input('price_range', 'value'),
+    # The store already holds the initial slider value
+    prevent_initial_call=True
+)
 
-    # Determine which graphs to show based on the user's selection
-    if graph_type == 'all':
-        return category_dist_fig, price_dist_fig, dosage_price_fig, quantity_fig, {'display': 'block'}, {'display': 'block'}, {'display': 'block'}, {'display': 'block'}, table_data
-    elif graph_type == 'category_dist':
-        return category_dist_fig, {}, {}, {}, {'display': 'block'}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, table_data
-    elif graph_type == 'price_dist':
-        return {}, price_dist_fig, {}, {}, {'display': 'none'}, {'display': 'block'}, {'display': 'none'}, {'display': 'none'}, table_data
-    elif graph_type == 'dosage_price':
-        return {}, {}, dosage_price_fig, {}, {'display': 'none'}, {'display': 'none'}, {'display': 'block'}, {'display': 'none'}, table_data
-    elif graph_type == 'quantity':
-        return {}, {}, {}, quantity_fig, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, {'display': 'block'}, table_data
 
-    return category_dist_fig, price_dist_fig, dosage_price_fig, quantity_fig, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, {'display': 'none'}, table_data
+# Show or hide the graphs in the browser; graph_type only affects visibility, so
+# toggling it needs no round trip to the server (see assets/callbacks.js)
+app.clientside_callback(
+    ClientsideFunction(namespace='clientside', function_name='toggle_visibility'),
+    [Output('category_dist_div', 'style'),
+     Output('price_dist_div', 'style'),
+     Output('dosage_price_div', 'style'),
+     Output('quantity_div', 'style')],
+    [Input('graph_type', 'value'),
+     Input('medicine_table', 'data')]
+)
 
 
 # Run the app